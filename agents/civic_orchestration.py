@@ -21,9 +21,10 @@ specialized knowledge to build bridges of accessible civic information for the e
 """
 
 import asyncio
+import functools
 import logging
+import threading
 from pathlib import Path
-from typing import cast
 
 from agent_framework import (
     AgentRunUpdateEvent,
@@ -31,14 +32,13 @@ from agent_framework import (
     HandoffBuilder,
     WorkflowOutputEvent,
 )
-from agent_framework.azure import AzureOpenAIChatClient
-from azure.identity import AzureCliCredential
 
 # Import centralized configuration
 import sys
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 from config.settings import settings
+from config.credentials import get_chat_client
 
 # Import tools
 from agents.tools.nyc_services import (
@@ -48,14 +48,8 @@ from agents.tools.nyc_services import (
     find_government_office,
     get_document_requirements
 )
-from agents.tools.bing_search_tools import (
-    get_search_tools_for_agent,
-    is_bing_search_configured
-)
-from agents.local_rag_agent import (
-    get_local_rag_tool_for_agent,
-    is_local_rag_available
-)
+from agents.tools.bing_search_tools import get_search_tools_for_agent
+from agents.local_rag_agent import get_local_rag_tool_for_agent
 from agents.complaint_reporter_agent import (
     get_complaint_reporter_tool,
     is_complaint_reporter_available
@@ -64,21 +58,6 @@ from agents.complaint_reporter_agent import (
 logging.basicConfig(level=logging.INFO)
 
 
-def _get_chat_client() -> AzureOpenAIChatClient:
-    """
-    Creates Azure OpenAI client using Azure CLI credentials.
-    Token provider ensures correct scope for Azure Cognitive Services.
-    """
-    credential = AzureCliCredential()
-    
-    return AzureOpenAIChatClient(
-        credential=credential,
-        endpoint=settings.AZURE_OPENAI.ENDPOINT,
-        deployment_name=settings.AZURE_OPENAI.DEPLOYMENT,
-        api_version=settings.AZURE_OPENAI.API_VERSION
-    )
-
-
 # ============================================================================
 # AGENT INSTRUCTIONS
 # ============================================================================
@@ -339,41 +318,72 @@ IMPORTANT:
 # AGENT CREATION
 # ============================================================================
 
-async def create_civic_agents(user_id: str = None):
+@functools.lru_cache(maxsize=1)
+def _get_memory_ai_client():
+    """
+    Returns the AsyncAzureOpenAI client used for memory extraction.
+    
+    Cached so every workflow and user shares one client (and one HTTP
+    connection pool) instead of paying a new TLS handshake per session.
+    
+    Returns:
+        AsyncAzureOpenAI or None: Client, or None if it cannot be configured
+    """
+    from openai import AsyncAzureOpenAI, OpenAIError
+    from agents.user_memory import EXTRACTION_TIMEOUT_SECONDS
+    
+    try:
+        return AsyncAzureOpenAI(
+            api_key=settings.AZURE_OPENAI.API_KEY,
+            api_version=settings.AZURE_OPENAI.API_VERSION,
+            azure_endpoint=settings.AZURE_OPENAI.ENDPOINT,
+            # Retries/backoff are handled by user_memory's own wrapper
+            max_retries=0,
+            timeout=EXTRACTION_TIMEOUT_SECONDS
+        )
+    except OpenAIError as e:
+        logging.warning("AI memory extraction disabled: %s", e)
+        return None
+
+
+async def _create_memory_provider(user_id: str):
+    """
+    Creates the user memory provider shared by the agents of one workflow.
+    
+    The provider loads the profile from Cosmos DB or disk in its constructor,
+    so it is built in a worker thread to keep the event loop free.
+    
+    Args:
+        user_id: User ID for personalized memory
+    
+    Returns:
+        UserMemoryProvider: Memory provider with AI extraction (if available)
+    """
+    from agents.user_memory import UserMemoryProvider
+    
+    return await asyncio.to_thread(
+        UserMemoryProvider, user_id, ai_client=_get_memory_ai_client()
+    )
+
+
+async def create_civic_agents(user_id: str = None, memory_provider=None):
     """
     Creates all specialized agents for the civic system with their tools.
     
     Args:
         user_id: User ID for personalized memory (optional)
+        memory_provider: Existing UserMemoryProvider to reuse (optional)
     
     Returns:
         dict: Dictionary with created agents
     """
     
     # Check external service configuration
-    bing_configured = is_bing_search_configured()
-    local_rag_available = is_local_rag_available()
     complaint_reporter_available = is_complaint_reporter_available()
     
-    # Create memory provider if user_id exists
-    memory_provider = None
-    if user_id:
-        from agents.user_memory import UserMemoryProvider
-        from openai import AsyncAzureOpenAI
-        import os
-        
-        # Create AI client for automatic extraction
-        ai_client = None
-        try:
-            ai_client = AsyncAzureOpenAI(
-                api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-                api_version="2024-10-21",
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-            )
-        except Exception:
-            pass
-        
-        memory_provider = UserMemoryProvider(user_id, ai_client=ai_client)
+    # Create memory provider if user_id exists and none was given
+    if memory_provider is None and user_id:
+        memory_provider = await _create_memory_provider(user_id)
     
     # 1. Civic Educator - with search and RAG tools (if available) + user memory
     educator_tools = get_search_tools_for_agent("educator")
@@ -391,7 +401,7 @@ async def create_civic_agents(user_id: str = None):
         name="Civic Educator",
         description="Explains civic concepts, how government works, and citizen rights",
         instructions=CIVIC_EDUCATOR_INSTRUCTIONS,
-        chat_client=_get_chat_client(),
+        chat_client=get_chat_client(),
         context_providers=context_providers,
         tools=all_educator_tools if all_educator_tools else None
     )
@@ -401,7 +411,7 @@ async def create_civic_agents(user_id: str = None):
         name="Citizen Guide",
         description="Provides practical info about procedures, services, and locations",
         instructions=CITIZEN_GUIDE_INSTRUCTIONS,
-        chat_client=_get_chat_client(),
+        chat_client=get_chat_client(),
         tools=[
             find_polling_location,
             check_voter_registration,
@@ -423,7 +433,7 @@ async def create_civic_agents(user_id: str = None):
         name="Complaint Handler",
         description="Helps report problems, complaints, and issues about public services",
         instructions=COMPLAINT_HANDLER_INSTRUCTIONS,
-        chat_client=_get_chat_client(),
+        chat_client=get_chat_client(),
         tools=complaint_handler_tools
     )
     
@@ -440,7 +450,7 @@ async def create_civic_agents(user_id: str = None):
         name="Fact Checker",
         description="Verifies information with official sources and detects misinformation",
         instructions=FACT_CHECKER_INSTRUCTIONS,
-        chat_client=_get_chat_client(),
+        chat_client=get_chat_client(),
         tools=all_fact_checker_tools if all_fact_checker_tools else None
     )
     
@@ -456,38 +466,23 @@ async def create_civic_agents(user_id: str = None):
 # WORKFLOW CREATION
 # ============================================================================
 
-async def create_civic_workflow(user_id: str = None):
+async def create_civic_workflow(user_id: str = None, memory_provider=None):
     """
     Creates and returns the configured civic orchestration workflow.
     
     Args:
         user_id: User ID for personalized memory (optional)
+        memory_provider: Existing UserMemoryProvider to reuse (optional)
     
     Returns:
         Workflow: Workflow configured with all specialized agents.
     """
+    # One memory provider per user, shared by the router and the specialists
+    if memory_provider is None and user_id:
+        memory_provider = await _create_memory_provider(user_id)
+    
     # Create specialized agents
-    agents = await create_civic_agents(user_id=user_id)
-    
-    # Create memory provider if user_id exists (for router)
-    memory_provider = None
-    if user_id:
-        from agents.user_memory import UserMemoryProvider
-        from openai import AsyncAzureOpenAI
-        import os
-        
-        # Create AI client for automatic extraction
-        ai_client = None
-        try:
-            ai_client = AsyncAzureOpenAI(
-                api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-                api_version="2024-10-21",
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-            )
-        except Exception:
-            pass
-        
-        memory_provider = UserMemoryProvider(user_id, ai_client=ai_client)
+    agents = await create_civic_agents(user_id=user_id, memory_provider=memory_provider)
     
     context_providers = [memory_provider] if memory_provider else None
     
@@ -496,7 +491,7 @@ async def create_civic_workflow(user_id: str = None):
         name="Civic Router",
         description="Coordinates and transfers queries to the correct specialized agent",
         instructions=CIVIC_ROUTER_INSTRUCTIONS,
-        chat_client=_get_chat_client(),
+        chat_client=get_chat_client(),
         context_providers=context_providers,
     )
     
@@ -535,16 +530,40 @@ async def run_civic_chat(query: str, verbose: bool = True, show_agent_names: boo
     Returns:
         str: Final system response.
     """
-    workflow = await create_civic_workflow(user_id=user_id)
+    memory_provider = await _create_memory_provider(user_id) if user_id else None
+    workflow = await create_civic_workflow(user_id=user_id, memory_provider=memory_provider)
+    
+    try:
+        return await _stream_civic_response(workflow, query, verbose, show_agent_names)
+    finally:
+        # Persist this query's profile changes now; the debounced save would
+        # otherwise be cancelled when the event loop shuts down
+        if memory_provider is not None:
+            await memory_provider.flush()
+
+
+async def _stream_civic_response(workflow, query: str, verbose: bool, show_agent_names: bool) -> str:
+    """
+    Streams one workflow run to stdout and returns the full response text.
+    
+    Args:
+        workflow: Civic orchestration workflow
+        query: User query
+        verbose: If True, prints progress in real-time
+        show_agent_names: If True, shows internal agent names
     
+    Returns:
+        str: Final system response.
+    """
     if verbose:
         print(f"\n[QUERY] {query}\n")
         print("-" * 80)
         if not show_agent_names:
             print("Minka Link: ", end="", flush=True)
     
-    response_text = ""
+    response_chunks: list[str] = []
     last_executor_id: str | None = None
+    write, flush = sys.stdout.write, sys.stdout.flush
     
     async for event in workflow.run_stream(query):
         if isinstance(event, AgentRunUpdateEvent):
@@ -559,24 +578,58 @@ async def run_civic_chat(query: str, verbose: bool = True, show_agent_names: boo
                 last_executor_id = eid
             
             # event.data can be string or AgentRunResponseUpdate
-            data_str = str(event.data) if not isinstance(event.data, str) else event.data
+            data = event.data
+            data_str = data if isinstance(data, str) else str(data)
             
             if verbose:
-                print(data_str, end="", flush=True)
-            response_text += data_str
+                write(data_str)
+                flush()
+            response_chunks.append(data_str)
         elif isinstance(event, WorkflowOutputEvent):
             final_response = event.data
     
     if verbose:
         print("\n" + "-" * 80)
     
-    return response_text
+    return "".join(response_chunks)
 
 
 # ============================================================================
 # INTERACTIVE MODE
 # ============================================================================
 
+async def _async_input(prompt: str) -> str:
+    """
+    Reads a line from stdin without blocking the event loop.
+    
+    input() runs in a daemon thread so background work (e.g. workflow
+    warm-up) keeps progressing, and a pending read never delays exit.
+    
+    Args:
+        prompt: Prompt to display
+    
+    Returns:
+        str: Line entered by the user
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def _resolve(setter, value):
+        if not future.done():
+            setter(value)
+    
+    def _read():
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(_resolve, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(_resolve, future.set_result, line)
+    
+    threading.Thread(target=_read, daemon=True).start()
+    return await future
+
+
 async def interactive_mode(show_agent_names: bool = False):
     """
     Interactive mode to test the system with multiple queries.
@@ -589,11 +642,18 @@ async def interactive_mode(show_agent_names: bool = False):
     
     # Generate user ID for this session
     import uuid
-    user_id = f"user_{str(uuid.uuid4())[:8]}"
+    user_id = f"user_{uuid.uuid4().hex[:8]}"
     print(f"[SESSION] User ID: {user_id}")
     
-    # Create workflow once with user memory
-    workflow = await create_civic_workflow(user_id=user_id)
+    # Create workflow once with user memory, in the background while the
+    # user types the first query (awaited only when it is actually needed)
+    async def _build_session():
+        memory_provider = await _create_memory_provider(user_id)
+        workflow = await create_civic_workflow(user_id=user_id, memory_provider=memory_provider)
+        return memory_provider, workflow
+    
+    session_task = asyncio.create_task(_build_session())
+    memory_provider = workflow = None
     
     # NOTE: Conversation history requires using Request/Response pattern
     # For now, UserMemoryProvider maintains user profile
@@ -601,7 +661,7 @@ async def interactive_mode(show_agent_names: bool = False):
     
     while True:
         try:
-            user_input = input("\n> ").strip()
+            user_input = (await _async_input("\n> ")).strip()
             
             if user_input.lower() in ['salir', 'exit', 'quit']:
                 print("\n[EXIT] Goodbye")
@@ -610,11 +670,20 @@ async def interactive_mode(show_agent_names: bool = False):
             if not user_input:
                 continue
             
+            if workflow is None:
+                try:
+                    memory_provider, workflow = await session_task
+                except Exception:
+                    # Rebuild on the next query instead of re-raising this same error
+                    session_task = asyncio.create_task(_build_session())
+                    raise
+            
             print("\n" + "-" * 80)
             if not show_agent_names:
                 print("Minka Link: ", end="", flush=True)
             
             last_executor_id: str | None = None
+            write, flush = sys.stdout.write, sys.stdout.flush
             # For now, pass only current message
             # TODO: Implement full history when pattern is fixed
             async for event in workflow.run_stream(user_input):
@@ -628,16 +697,26 @@ async def interactive_mode(show_agent_names: bool = False):
                         print(f"[{eid}]:", end=" ", flush=True)
                         last_executor_id = eid
                     
-                    data_str = str(event.data) if not isinstance(event.data, str) else event.data
-                    print(data_str, end="", flush=True)
+                    data = event.data
+                    write(data if isinstance(data, str) else str(data))
+                    flush()
             
             print("\n" + "-" * 80)
             
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
             print("\n\n[EXIT] Goodbye")
             break
         except Exception as e:
             print(f"\n Error: {e}")
+    
+    # Persist the last turns' profile changes before the event loop shuts down
+    if memory_provider is not None:
+        await memory_provider.flush()
+    elif not session_task.done():
+        session_task.cancel()
+    elif not session_task.cancelled():
+        # Retrieve a build error nobody awaited so asyncio doesn't log it
+        session_task.exception()
 
 
 
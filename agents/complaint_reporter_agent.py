@@ -12,45 +12,37 @@ The agent can be used as a tool by the Complaint Handler.
 
 import sys
 import uuid
+import asyncio
+import functools
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Annotated, Optional
+from typing import Annotated
 
 # Import configuration
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 from config.settings import settings
+from config.credentials import get_azure_credential, get_chat_client
 
 # Agent Framework imports
 from agent_framework import ChatAgent
-from agent_framework.azure import AzureOpenAIChatClient
-from azure.identity import AzureCliCredential
 
 # Cosmos DB imports
 try:
-    from azure.cosmos import CosmosClient, PartitionKey
-    from azure.cosmos.exceptions import CosmosResourceNotFoundError
+    from azure.cosmos import CosmosClient
     COSMOS_AVAILABLE = True
 except ImportError:
     COSMOS_AVAILABLE = False
 
 
-def _get_chat_client() -> AzureOpenAIChatClient:
-    """Creates Azure OpenAI client."""
-    credential = AzureCliCredential()
-    
-    return AzureOpenAIChatClient(
-        credential=credential,
-        endpoint=settings.AZURE_OPENAI.ENDPOINT,
-        deployment_name=settings.AZURE_OPENAI.DEPLOYMENT,
-        api_version=settings.AZURE_OPENAI.API_VERSION
-    )
-
-
+@functools.lru_cache(maxsize=1)
 def _get_cosmos_container():
     """
     Gets Cosmos DB container to store complaints.
     
+    Built once and reused, so every complaint shares the same client
+    (connection pool and TLS sessions) instead of opening a new one.
+    
     Returns:
         ContainerProxy: Cosmos DB container
     """
@@ -69,7 +61,7 @@ def _get_cosmos_container():
         )
     else:
         # Use Azure CLI credential
-        credential = AzureCliCredential()
+        credential = get_azure_credential()
         client = CosmosClient(
             settings.COSMOS_DB.ENDPOINT,
             credential=credential
@@ -104,21 +96,23 @@ def save_complaint_to_cosmos(complaint_data: dict) -> dict:
             }
         
         # Create item with timestamp and unique ID
+        now = datetime.now(timezone.utc)
         item = {
             "id": str(uuid.uuid4()),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now.isoformat(),
             **complaint_data,
-            "_ts": int(datetime.now(timezone.utc).timestamp())
+            "_ts": int(now.timestamp())
         }
         
         # Save to Cosmos DB
         # Partition key is /location/city, taken automatically from item
         created_item = container.create_item(body=item)
+        complaint_id = created_item["id"]
         
         return {
             "success": True,
-            "complaint_id": created_item["id"],
-            "message": f"Complaint registered successfully with ID: {created_item['id']}"
+            "complaint_id": complaint_id,
+            "message": f"Complaint registered successfully with ID: {complaint_id}"
         }
         
     except Exception as e:
@@ -205,7 +199,7 @@ async def create_complaint_reporter_agent() -> ChatAgent:
     from agent_framework import ai_function
     
     @ai_function
-    def save_complaint(
+    async def save_complaint(
         complaint_json: Annotated[str, "JSON string with complaint data in specified format"]
     ) -> str:
         """
@@ -218,8 +212,8 @@ async def create_complaint_reporter_agent() -> ChatAgent:
             # Parse JSON
             complaint_data = json.loads(complaint_json)
             
-            # Save to Cosmos DB
-            result = save_complaint_to_cosmos(complaint_data)
+            # Save to Cosmos DB (blocking SDK call, kept off the event loop)
+            result = await asyncio.to_thread(save_complaint_to_cosmos, complaint_data)
             
             if result["success"]:
                 return f"✅ {result['message']}\n\nYou can use this ID to track your complaint."
@@ -236,7 +230,7 @@ async def create_complaint_reporter_agent() -> ChatAgent:
         name="Complaint Reporter",
         description="Conversational agent that collects information to report citizen complaints",
         instructions=COMPLAINT_REPORTER_INSTRUCTIONS,
-        chat_client=_get_chat_client(),
+        chat_client=get_chat_client(),
         tools=[save_complaint]
     )
     
@@ -18,7 +18,7 @@ from typing import Annotated
 # Import configuration
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
-from config.settings import settings
+from config.settings import settings  # noqa: F401 - loads .env and validates config on import
 
 # Agent Framework imports
 from agent_framework import ai_function
@@ -70,9 +70,12 @@ def load_pdf_documents(pdf_directory: str = "data-resource", verbose: bool = Fal
                     paragraphs = text.split('\n\n')
                     
                     for para in paragraphs:
-                        if para.strip():
+                        para = para.strip()
+                        if para:
                             chunks.append({
-                                'text': para.strip(),
+                                'text': para,
+                                # Lowercased once here instead of on every search
+                                'text_lower': para.lower(),
                                 'page': page_num,
                                 'source': pdf_path.name
                             })
@@ -96,13 +99,14 @@ def search_documents(
     if not pdf_chunks:
         return "No documents loaded. Documents should be in the 'data-resource' directory."
     
-    query_lower = query.lower()
+    query_words = query.lower().split()
     results = []
     
     # Simple keyword search
     for chunk in pdf_chunks:
         # Calculate simple relevance
-        relevance = sum(1 for word in query_lower.split() if word in chunk['text'].lower())
+        text_lower = chunk['text_lower']
+        relevance = sum(1 for word in query_words if word in text_lower)
         
         if relevance > 0:
             results.append({
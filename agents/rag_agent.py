@@ -8,25 +8,12 @@ in official documents indexed in Azure AI Foundry.
 import sys
 from pathlib import Path
 from agent_framework import ChatAgent, HostedFileSearchTool
-from agent_framework.azure import AzureOpenAIChatClient
-from azure.identity import AzureCliCredential
 
 # Import configuration
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 from config.settings import settings
-
-
-def _get_chat_client() -> AzureOpenAIChatClient:
-    """Creates Azure OpenAI client."""
-    credential = AzureCliCredential()
-    
-    return AzureOpenAIChatClient(
-        credential=credential,
-        endpoint=settings.AZURE_OPENAI.ENDPOINT,
-        deployment_name=settings.AZURE_OPENAI.DEPLOYMENT,
-        api_version=settings.AZURE_OPENAI.API_VERSION
-    )
+from config.credentials import get_chat_client
 
 
 RAG_AGENT_INSTRUCTIONS = """
@@ -86,7 +73,7 @@ def create_rag_agent() -> ChatAgent:
         name="Document Search Agent",
         description="Searches through official documents to find relevant information",
         instructions=RAG_AGENT_INSTRUCTIONS,
-        chat_client=_get_chat_client(),
+        chat_client=get_chat_client(),
         tools=[file_search_tool]
     )
     
@@ -26,9 +26,7 @@ Prerequisites:
 
 import sys
 from pathlib import Path
-from typing import Annotated, Optional
-from pydantic import Field
-from agent_framework import ai_function, HostedFileSearchTool
+from agent_framework import HostedFileSearchTool
 
 # Importar configuración centralizada
 project_root = Path(__file__).parent.parent.parent
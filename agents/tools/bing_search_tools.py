@@ -17,7 +17,7 @@ Para configurar:
 
 import sys
 from pathlib import Path
-from typing import Annotated, Optional
+from typing import Annotated
 from pydantic import Field
 from agent_framework import ai_function, HostedWebSearchTool
 
@@ -108,6 +108,13 @@ def create_news_search_tool() -> HostedWebSearchTool:
 # CUSTOM SEARCH FUNCTIONS (Alternativa si no tienes Bing connection)
 # ============================================================================
 
+NYC_GOV_DIRECT_LINKS = {
+    "nyc.gov": "https://www.nyc.gov/",
+    "vote.nyc": "https://vote.nyc/",
+    "portal.311.nyc.gov": "https://portal.311.nyc.gov/"
+}
+
+
 @ai_function(
     name="search_nyc_gov_sites",
     description="Busca información específicamente en sitios .gov de NYC"
@@ -143,16 +150,42 @@ def search_nyc_gov_sites(
             }
         ],
         "note": "Estos son resultados simulados. Para información actualizada, visita directamente el sitio oficial.",
-        "direct_links": {
-            "nyc.gov": "https://www.nyc.gov/",
-            "vote.nyc": "https://vote.nyc/",
-            "portal.311.nyc.gov": "https://portal.311.nyc.gov/"
-        }
+        "direct_links": NYC_GOV_DIRECT_LINKS
     }
     
     return simulated_results
 
 
+# Mapeo de temas a fuentes oficiales (construido una sola vez)
+OFFICIAL_SOURCES = {
+    "voting": {
+        "primary": "https://vote.nyc/",
+        "secondary": "https://www.elections.ny.gov/",
+        "description": "NYC Board of Elections y NY State Board of Elections"
+    },
+    "housing": {
+        "primary": "https://www1.nyc.gov/site/hpd/",
+        "secondary": "https://www1.nyc.gov/site/rentguidelinesboard/",
+        "description": "NYC Housing Preservation & Development"
+    },
+    "transportation": {
+        "primary": "https://www.nyc.gov/html/dot/",
+        "secondary": "https://new.mta.info/",
+        "description": "NYC DOT y MTA"
+    },
+    "311": {
+        "primary": "https://portal.311.nyc.gov/",
+        "secondary": "https://www.nyc.gov/311/",
+        "description": "NYC 311 Services"
+    },
+    "general": {
+        "primary": "https://www.nyc.gov/",
+        "secondary": "https://www.ny.gov/",
+        "description": "NYC.gov y NY.gov"
+    }
+}
+
+
 @ai_function(
     name="verify_with_official_source",
     description="Verifica una afirmación buscando en fuentes oficiales"
@@ -174,36 +207,7 @@ def verify_with_official_source(
     Returns:
         dict: Resultado de verificación con fuentes
     """
-    # Mapeo de temas a fuentes oficiales
-    official_sources = {
-        "voting": {
-            "primary": "https://vote.nyc/",
-            "secondary": "https://www.elections.ny.gov/",
-            "description": "NYC Board of Elections y NY State Board of Elections"
-        },
-        "housing": {
-            "primary": "https://www1.nyc.gov/site/hpd/",
-            "secondary": "https://www1.nyc.gov/site/rentguidelinesboard/",
-            "description": "NYC Housing Preservation & Development"
-        },
-        "transportation": {
-            "primary": "https://www.nyc.gov/html/dot/",
-            "secondary": "https://new.mta.info/",
-            "description": "NYC DOT y MTA"
-        },
-        "311": {
-            "primary": "https://portal.311.nyc.gov/",
-            "secondary": "https://www.nyc.gov/311/",
-            "description": "NYC 311 Services"
-        },
-        "general": {
-            "primary": "https://www.nyc.gov/",
-            "secondary": "https://www.ny.gov/",
-            "description": "NYC.gov y NY.gov"
-        }
-    }
-    
-    source_info = official_sources.get(topic.lower(), official_sources["general"])
+    source_info = OFFICIAL_SOURCES.get(topic.lower(), OFFICIAL_SOURCES["general"])
     
     return {
         "claim": claim,
@@ -5,11 +5,17 @@ Estas tools proporcionan acceso a información oficial de la ciudad de Nueva Yor
 incluyendo lugares de votación, servicios 311, y oficinas gubernamentales.
 """
 
+import re
 from typing import Annotated
 from pydantic import Field
 from agent_framework import ai_function
 
 
+def _keys_pattern(table: dict) -> re.Pattern:
+    """Compila las claves de una tabla en una sola alternancia (una pasada por búsqueda)."""
+    return re.compile("|".join(map(re.escape, table)))
+
+
 # ============================================================================
 # POLLING LOCATION TOOLS
 # ============================================================================
@@ -125,6 +131,70 @@ def check_voter_registration(
 # 311 SERVICES TOOLS
 # ============================================================================
 
+# Mapeo de problemas comunes a servicios 311 (construido una sola vez)
+PROBLEM_CATEGORIES_311 = {
+    "pothole": {
+        "service": "Street Condition - Pothole",
+        "department": "Department of Transportation (DOT)",
+        "description": "Reportar baches en calles de NYC",
+        "what_to_provide": [
+            "Ubicación exacta (calle e intersección)",
+            "Tamaño aproximado del bache",
+            "Fotos si es posible"
+        ],
+        "response_time": "Varía según severidad, típicamente 1-7 días"
+    },
+    "garbage": {
+        "service": "Sanitation Condition",
+        "department": "Department of Sanitation (DSNY)",
+        "description": "Reportar basura acumulada, contenedores desbordados",
+        "what_to_provide": [
+            "Ubicación exacta",
+            "Tipo de basura (residencial, comercial)",
+            "Fotos si es posible"
+        ],
+        "response_time": "1-3 días hábiles"
+    },
+    "noise": {
+        "service": "Noise Complaint",
+        "department": "NYPD o DEP (según tipo)",
+        "description": "Reportar ruido excesivo",
+        "what_to_provide": [
+            "Dirección exacta de donde proviene el ruido",
+            "Tipo de ruido (música, construcción, etc.)",
+            "Horario del ruido"
+        ],
+        "response_time": "Varía, emergencias llamar al 911",
+        "note": "Para ruido de construcción fuera de horario, contactar DEP"
+    },
+    "graffiti": {
+        "service": "Graffiti Removal",
+        "department": "Department of Sanitation (DSNY)",
+        "description": "Solicitar remoción de grafiti",
+        "what_to_provide": [
+            "Ubicación exacta",
+            "Tipo de superficie (pared, poste, etc.)",
+            "Fotos"
+        ],
+        "response_time": "5-10 días hábiles"
+    }
+}
+
+GENERIC_311_CATEGORY = {
+    "service": "General Inquiry",
+    "department": "311 Customer Service",
+    "description": "Servicio general de información y reportes",
+    "what_to_provide": [
+        "Descripción detallada del problema",
+        "Ubicación si aplica",
+        "Información de contacto"
+    ],
+    "response_time": "Varía según el tipo de servicio"
+}
+
+PROBLEM_CATEGORIES_311_PATTERN = _keys_pattern(PROBLEM_CATEGORIES_311)
+
+
 @ai_function(
     name="search_311_services",
     description="Busca servicios 311 de NYC para reportar problemas o solicitar información"
@@ -141,77 +211,14 @@ def search_311_services(
     Returns:
         dict: Información sobre cómo reportar el problema y qué esperar
     """
-    # Mapeo de problemas comunes a servicios 311
-    problem_categories = {
-        "pothole": {
-            "service": "Street Condition - Pothole",
-            "department": "Department of Transportation (DOT)",
-            "description": "Reportar baches en calles de NYC",
-            "what_to_provide": [
-                "Ubicación exacta (calle e intersección)",
-                "Tamaño aproximado del bache",
-                "Fotos si es posible"
-            ],
-            "response_time": "Varía según severidad, típicamente 1-7 días"
-        },
-        "garbage": {
-            "service": "Sanitation Condition",
-            "department": "Department of Sanitation (DSNY)",
-            "description": "Reportar basura acumulada, contenedores desbordados",
-            "what_to_provide": [
-                "Ubicación exacta",
-                "Tipo de basura (residencial, comercial)",
-                "Fotos si es posible"
-            ],
-            "response_time": "1-3 días hábiles"
-        },
-        "noise": {
-            "service": "Noise Complaint",
-            "department": "NYPD o DEP (según tipo)",
-            "description": "Reportar ruido excesivo",
-            "what_to_provide": [
-                "Dirección exacta de donde proviene el ruido",
-                "Tipo de ruido (música, construcción, etc.)",
-                "Horario del ruido"
-            ],
-            "response_time": "Varía, emergencias llamar al 911",
-            "note": "Para ruido de construcción fuera de horario, contactar DEP"
-        },
-        "graffiti": {
-            "service": "Graffiti Removal",
-            "department": "Department of Sanitation (DSNY)",
-            "description": "Solicitar remoción de grafiti",
-            "what_to_provide": [
-                "Ubicación exacta",
-                "Tipo de superficie (pared, poste, etc.)",
-                "Fotos"
-            ],
-            "response_time": "5-10 días hábiles"
-        }
-    }
-    
     # Buscar categoría más cercana
-    problem_lower = problem_type.lower()
-    matched_category = None
-    
-    for key in problem_categories:
-        if key in problem_lower:
-            matched_category = problem_categories[key]
-            break
+    match = PROBLEM_CATEGORIES_311_PATTERN.search(problem_type.lower())
     
-    if not matched_category:
+    if match:
+        matched_category = PROBLEM_CATEGORIES_311[match.group()]
+    else:
         # Categoría genérica
-        matched_category = {
-            "service": "General Inquiry",
-            "department": "311 Customer Service",
-            "description": "Servicio general de información y reportes",
-            "what_to_provide": [
-                "Descripción detallada del problema",
-                "Ubicación si aplica",
-                "Información de contacto"
-            ],
-            "response_time": "Varía según el tipo de servicio"
-        }
+        matched_category = GENERIC_311_CATEGORY
     
     return {
         "status": "success",
@@ -234,6 +241,63 @@ def search_311_services(
 # GOVERNMENT OFFICES TOOLS
 # ============================================================================
 
+# Datos simulados - en producción usar NYC Open Data API
+GOVERNMENT_OFFICES = {
+    "dmv": {
+        "name": "Department of Motor Vehicles (DMV)",
+        "description": "Licencias de conducir, identificaciones, registros de vehículos",
+        "main_office": {
+            "address": "11 Greenwich Street, New York, NY 10004",
+            "hours": "Lunes-Viernes: 8:30 AM - 4:00 PM",
+            "phone": "1-518-486-9786",
+            "appointments": "Recomendado hacer cita en dmv.ny.gov"
+        },
+        "services": [
+            "Licencias de conducir",
+            "Identificaciones estatales",
+            "Registro de vehículos",
+            "Renovaciones"
+        ],
+        "website": "https://dmv.ny.gov/"
+    },
+    "board of elections": {
+        "name": "NYC Board of Elections",
+        "description": "Registro de votantes, información electoral",
+        "main_office": {
+            "address": "32 Broadway, 7th Floor, New York, NY 10004",
+            "hours": "Lunes-Viernes: 9:00 AM - 5:00 PM",
+            "phone": "1-866-VOTE-NYC (1-866-868-3692)",
+            "appointments": "No requerido para la mayoría de servicios"
+        },
+        "services": [
+            "Registro de votantes",
+            "Información sobre elecciones",
+            "Boletas de voto en ausencia",
+            "Verificación de registro"
+        ],
+        "website": "https://vote.nyc/"
+    },
+    "social services": {
+        "name": "Department of Social Services (DSS)",
+        "description": "Asistencia pública, SNAP, Medicaid",
+        "contact": {
+            "phone": "311",
+            "hours": "Varía por centro",
+            "appointments": "Llamar al 311 para ubicación más cercana"
+        },
+        "services": [
+            "SNAP (cupones de alimentos)",
+            "Medicaid",
+            "Asistencia en efectivo",
+            "Servicios de empleo"
+        ],
+        "website": "https://www1.nyc.gov/site/hra/"
+    }
+}
+
+GOVERNMENT_OFFICES_PATTERN = _keys_pattern(GOVERNMENT_OFFICES)
+
+
 @ai_function(
     name="find_government_office",
     description="Encuentra oficinas gubernamentales de NYC y sus horarios"
@@ -252,70 +316,10 @@ def find_government_office(
     Returns:
         dict: Información de la oficina incluyendo dirección, horarios y contacto
     """
-    # Datos simulados - en producción usar NYC Open Data API
-    offices = {
-        "dmv": {
-            "name": "Department of Motor Vehicles (DMV)",
-            "description": "Licencias de conducir, identificaciones, registros de vehículos",
-            "main_office": {
-                "address": "11 Greenwich Street, New York, NY 10004",
-                "hours": "Lunes-Viernes: 8:30 AM - 4:00 PM",
-                "phone": "1-518-486-9786",
-                "appointments": "Recomendado hacer cita en dmv.ny.gov"
-            },
-            "services": [
-                "Licencias de conducir",
-                "Identificaciones estatales",
-                "Registro de vehículos",
-                "Renovaciones"
-            ],
-            "website": "https://dmv.ny.gov/"
-        },
-        "board of elections": {
-            "name": "NYC Board of Elections",
-            "description": "Registro de votantes, información electoral",
-            "main_office": {
-                "address": "32 Broadway, 7th Floor, New York, NY 10004",
-                "hours": "Lunes-Viernes: 9:00 AM - 5:00 PM",
-                "phone": "1-866-VOTE-NYC (1-866-868-3692)",
-                "appointments": "No requerido para la mayoría de servicios"
-            },
-            "services": [
-                "Registro de votantes",
-                "Información sobre elecciones",
-                "Boletas de voto en ausencia",
-                "Verificación de registro"
-            ],
-            "website": "https://vote.nyc/"
-        },
-        "social services": {
-            "name": "Department of Social Services (DSS)",
-            "description": "Asistencia pública, SNAP, Medicaid",
-            "contact": {
-                "phone": "311",
-                "hours": "Varía por centro",
-                "appointments": "Llamar al 311 para ubicación más cercana"
-            },
-            "services": [
-                "SNAP (cupones de alimentos)",
-                "Medicaid",
-                "Asistencia en efectivo",
-                "Servicios de empleo"
-            ],
-            "website": "https://www1.nyc.gov/site/hra/"
-        }
-    }
-    
     # Buscar oficina
-    office_lower = office_type.lower()
-    matched_office = None
-    
-    for key in offices:
-        if key in office_lower:
-            matched_office = offices[key]
-            break
+    match = GOVERNMENT_OFFICES_PATTERN.search(office_type.lower())
     
-    if not matched_office:
+    if not match:
         return {
             "status": "not_found",
             "message": f"No se encontró información específica para '{office_type}'",
@@ -325,7 +329,7 @@ def find_government_office(
     
     result = {
         "status": "success",
-        "office": matched_office,
+        "office": GOVERNMENT_OFFICES[match.group()],
         "general_info": {
             "note": "Los horarios pueden variar. Llama antes de visitar.",
             "holidays": "Cerrado en días festivos federales y estatales",
@@ -343,6 +347,64 @@ def find_government_office(
 # DOCUMENT REQUIREMENTS TOOLS
 # ============================================================================
 
+DOCUMENT_REQUIREMENTS = {
+    "voter registration": {
+        "required": [
+            "Prueba de ciudadanía estadounidense",
+            "Prueba de residencia en NYC (al menos 30 días antes de elecciones)"
+        ],
+        "accepted_documents": {
+            "citizenship": [
+                "Certificado de nacimiento de EE.UU.",
+                "Pasaporte estadounidense",
+                "Certificado de naturalización"
+            ],
+            "residence": [
+                "Licencia de conducir de NY",
+                "Factura de servicios públicos",
+                "Estado de cuenta bancario",
+                "Contrato de alquiler"
+            ]
+        },
+        "notes": [
+            "Si te registras por correo por primera vez, puede que necesites ID adicional",
+            "Puedes registrarte en línea si tienes licencia de NY o ID estatal"
+        ]
+    },
+    "driver license": {
+        "required": [
+            "Prueba de identidad",
+            "Prueba de fecha de nacimiento",
+            "Prueba de residencia en NY",
+            "Número de Seguro Social"
+        ],
+        "accepted_documents": {
+            "identity": [
+                "Pasaporte válido",
+                "Certificado de nacimiento",
+                "Tarjeta de residencia permanente"
+            ],
+            "residence": [
+                "Factura de servicios (no más de 90 días)",
+                "Estado de cuenta bancario",
+                "Contrato de alquiler o escritura"
+            ]
+        },
+        "additional": [
+            "Aprobar examen de la vista",
+            "Aprobar examen escrito (si es primera licencia)",
+            "Aprobar examen de manejo"
+        ],
+        "notes": [
+            "Necesitas 6 puntos de identificación",
+            "Consulta dmv.ny.gov para lista completa de documentos aceptados"
+        ]
+    }
+}
+
+DOCUMENT_REQUIREMENTS_PATTERN = _keys_pattern(DOCUMENT_REQUIREMENTS)
+
+
 @ai_function(
     name="get_document_requirements",
     description="Obtiene lista de documentos necesarios para trámites específicos"
@@ -359,70 +421,9 @@ def get_document_requirements(
     Returns:
         dict: Lista de documentos requeridos y opcionales
     """
-    requirements = {
-        "voter registration": {
-            "required": [
-                "Prueba de ciudadanía estadounidense",
-                "Prueba de residencia en NYC (al menos 30 días antes de elecciones)"
-            ],
-            "accepted_documents": {
-                "citizenship": [
-                    "Certificado de nacimiento de EE.UU.",
-                    "Pasaporte estadounidense",
-                    "Certificado de naturalización"
-                ],
-                "residence": [
-                    "Licencia de conducir de NY",
-                    "Factura de servicios públicos",
-                    "Estado de cuenta bancario",
-                    "Contrato de alquiler"
-                ]
-            },
-            "notes": [
-                "Si te registras por correo por primera vez, puede que necesites ID adicional",
-                "Puedes registrarte en línea si tienes licencia de NY o ID estatal"
-            ]
-        },
-        "driver license": {
-            "required": [
-                "Prueba de identidad",
-                "Prueba de fecha de nacimiento",
-                "Prueba de residencia en NY",
-                "Número de Seguro Social"
-            ],
-            "accepted_documents": {
-                "identity": [
-                    "Pasaporte válido",
-                    "Certificado de nacimiento",
-                    "Tarjeta de residencia permanente"
-                ],
-                "residence": [
-                    "Factura de servicios (no más de 90 días)",
-                    "Estado de cuenta bancario",
-                    "Contrato de alquiler o escritura"
-                ]
-            },
-            "additional": [
-                "Aprobar examen de la vista",
-                "Aprobar examen escrito (si es primera licencia)",
-                "Aprobar examen de manejo"
-            ],
-            "notes": [
-                "Necesitas 6 puntos de identificación",
-                "Consulta dmv.ny.gov para lista completa de documentos aceptados"
-            ]
-        }
-    }
-    
-    service_lower = service.lower()
-    matched_service = None
-    
-    for key in requirements:
-        if key in service_lower:
-            matched_service = requirements[key]
-            break
+    match = DOCUMENT_REQUIREMENTS_PATTERN.search(service.lower())
     
-    if not matched_service:
+    if not match:
         return {
             "status": "not_found",
             "message": f"No se encontró información específica para '{service}'",
@@ -433,6 +434,6 @@ def get_document_requirements(
     return {
         "status": "success",
         "service": service,
-        "requirements": matched_service,
+        "requirements": DOCUMENT_REQUIREMENTS[match.group()],
         "important": "Siempre lleva documentos originales, no copias, a menos que se especifique lo contrario"
     }
@@ -11,11 +11,29 @@ Based on Microsoft Agent Framework ContextProvider pattern.
 
 import sys
 import json
+import copy
 import os
+import re
+import string
+import time
+import random
+import atexit
+import asyncio
+import hashlib
+import functools
+import logging
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Optional, List, Dict
-from openai import AsyncAzureOpenAI
+from typing import Optional
+from openai import (
+    AsyncAzureOpenAI,
+    APIConnectionError,
+    APIError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
 
 # Import configuration
 project_root = Path(__file__).parent.parent
@@ -28,14 +46,380 @@ from config.settings import settings
 try:
     from azure.cosmos import CosmosClient
     from azure.cosmos.exceptions import CosmosResourceNotFoundError
-    from azure.identity import AzureCliCredential
+    from azure.core.exceptions import AzureError
+    from config.credentials import get_azure_credential
     COSMOS_AVAILABLE = True
 except ImportError:
     COSMOS_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
 # Directory to save user profiles (local fallback)
 USER_DATA_DIR = project_root / "data_user"
 
+def _empty_profile() -> dict:
+    """Returns a new, empty user profile."""
+    return {
+        "user_info": {
+            "name": None,
+            "location": None,
+            "profession": None,
+            "last_updated": None
+        },
+        "extracted_data": {
+            "procedures": [],      # Procedimientos/trámites consultados
+            "documents": [],       # Documentos mencionados
+            "important_dates": []  # Fechas importantes
+        }
+    }
+
+
+def _empty_session_data() -> dict:
+    """Returns new, empty session statistics."""
+    return {
+        "interaction_count": 0,
+        "last_agent": None
+    }
+
+
+def _normalize_profile(profile) -> dict:
+    """
+    Returns a loaded profile with at least the structure of _empty_profile().
+    
+    Missing or malformed sections (older or hand-edited files) are replaced by
+    empty ones so later updates don't fail; unknown keys are preserved.
+    """
+    if not isinstance(profile, dict):
+        return _empty_profile()
+    
+    normalized = dict(profile)
+    for section, defaults in _empty_profile().items():
+        loaded = profile.get(section)
+        merged = {**defaults, **loaded} if isinstance(loaded, dict) else defaults
+        for key, default in defaults.items():
+            if isinstance(default, list) and not isinstance(merged.get(key), list):
+                merged[key] = default
+        normalized[section] = merged
+    return normalized
+
+
+def _normalize_session_data(session_data) -> dict:
+    """Returns loaded session statistics with every expected key present."""
+    if not isinstance(session_data, dict):
+        return _empty_session_data()
+    return {**_empty_session_data(), **session_data}
+
+
+def _item_key(item) -> str:
+    """
+    Returns a hashable de-duplication key for an extracted item.
+    
+    Profiles saved by older versions may hold dicts/lists (whatever the model
+    returned) instead of strings; those are keyed by their canonical JSON.
+    """
+    if isinstance(item, str):
+        return item
+    return json.dumps(item, sort_keys=True, default=str)
+
+
+def _dumps_json(data: dict) -> bytes:
+    """Serializes data as indented UTF-8 JSON bytes."""
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _extract_json_span(text: str) -> Optional[str]:
+    """
+    Returns the first balanced {...} object in text, scanning it once.
+    
+    Braces inside JSON strings are ignored, so the span ends where the first
+    object actually closes even if more braces follow it.
+    
+    Args:
+        text: Model response
+    
+    Returns:
+        str or None: JSON object substring, or None if there is none
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    
+    return None
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """
+    Writes data to path atomically (temp file in the same directory + os.replace).
+    
+    A crash mid-write leaves the previous file intact instead of a truncated one.
+    """
+    tmp_path = path.with_name(f"{path.name}.tmp.{os.getpid()}")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+# Set once the local profile directory has been created in this process
+_user_data_dir_ready = False
+
+
+def _ensure_user_data_dir() -> None:
+    """Creates USER_DATA_DIR once per process instead of once per provider."""
+    global _user_data_dir_ready
+    
+    if not _user_data_dir_ready:
+        USER_DATA_DIR.mkdir(exist_ok=True)
+        _user_data_dir_ready = True
+
+
+# Seconds to wait before persisting a changed profile (coalesces bursts of turns)
+SAVE_DEBOUNCE_SECONDS = 2.0
+
+# Providers with unsaved changes, held strongly until flushed so a cancelled
+# debounce task (and its reference cycle) can't be collected before atexit runs
+_dirty_providers: "dict[int, UserMemoryProvider]" = {}
+
+
+@atexit.register
+def _flush_pending_profiles() -> None:
+    """Saves profiles whose debounced write never ran (e.g. the loop was closed)."""
+    for provider in list(_dirty_providers.values()):
+        if provider._dirty:
+            provider._dirty = False
+            provider._save_profile()
+    _dirty_providers.clear()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_memory_container():
+    """
+    Gets Cosmos DB container for user memory.
+    
+    Shared by all providers so sessions reuse one client and one credential
+    (with its cached token) instead of creating them per user.
+    """
+    if not COSMOS_AVAILABLE:
+        raise ImportError("azure-cosmos is not installed")
+    
+    # Validate configuration
+    settings.validate_cosmos_db_memory()
+    
+    # Create client
+    if settings.COSMOS_DB.KEY:
+        client = CosmosClient(
+            settings.COSMOS_DB.ENDPOINT,
+            credential=settings.COSMOS_DB.KEY
+        )
+    else:
+        credential = get_azure_credential()
+        client = CosmosClient(
+            settings.COSMOS_DB.ENDPOINT,
+            credential=credential
+        )
+    
+    # Get container
+    database = client.get_database_client(settings.COSMOS_DB.DATABASE_NAME)
+    container = database.get_container_client(settings.COSMOS_DB.MEMORY_CONTAINER_NAME)
+    
+    return container
+
+
+# Model deployment used for AI extraction (bound once from settings, not per call)
+EXTRACTION_DEPLOYMENT = settings.AZURE_OPENAI.DEPLOYMENT
+
+# Limits for AI extraction calls (shared by all providers in the process)
+MAX_CONCURRENT_EXTRACTIONS = 10
+MAX_EXTRACTION_ATTEMPTS = 3
+# Per-request timeout for the extraction client; its SDK retries are disabled
+# (max_retries=0) so _chat_completion_with_retry is the only retry policy
+EXTRACTION_TIMEOUT_SECONDS = 20.0
+RETRYABLE_AI_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+_extraction_semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXTRACTIONS)
+
+# Categories of extracted context stored as de-duplicated lists
+EXTRACTED_CATEGORIES = ("procedures", "documents", "important_dates")
+
+# Most recent items kept per category (oldest are evicted first)
+MAX_EXTRACTED_ITEMS = 50
+
+# Messages made only of greetings/thanks/acknowledgements carry nothing to extract
+SMALL_TALK_PATTERN = re.compile(
+    r"^(?:[\W_]*(?:hola|hello|hi|hey|buenos d[ií]as|buenas tardes|buenas noches|buenas|"
+    r"good morning|good afternoon|good evening|gracias|muchas gracias|thanks|thank you|"
+    r"ok|okay|vale|s[ií]|yes|no|adi[oó]s|bye|goodbye|chau|perfecto|perfect|great|genial|"
+    r"de nada|claro|sure)\b)+[\W_]*$",
+    re.IGNORECASE
+)
+
+# Messages that are nothing but a date or a document name are parsed locally
+_MONTHS = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|jun(?:e)?|jul(?:y)?|aug(?:ust)?|"
+    r"sep(?:tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?|enero|febrero|marzo|abril|mayo|"
+    r"junio|julio|agosto|septiembre|octubre|noviembre|diciembre)"
+)
+DATE_ONLY_PATTERN = re.compile(
+    r"^\s*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}-\d{2}-\d{2}|"
+    r"\d{1,2}(?:st|nd|rd|th)?(?: de)? " + _MONTHS + r"(?:,? \d{4})?|"
+    + _MONTHS + r" \d{1,2}(?:st|nd|rd|th)?(?:,? \d{4})?)\s*[.!]?\s*$",
+    re.IGNORECASE
+)
+DOCUMENT_ONLY_PATTERN = re.compile(
+    r"^\s*(?:(?:my|mi|el|la|the|a|an|un|una)\s+)?"
+    r"(passport|pasaporte|dni|id|state id|ssn|social security card|green card|"
+    r"driver'?s license|driver license|licencia de conducir|c[eé]dula|"
+    r"birth certificate|certificado de nacimiento)\s*[.!]?\s*$",
+    re.IGNORECASE
+)
+
+
+def _quick_extract(message: str) -> Optional[dict]:
+    """
+    Extracts context without AI when the message is only a date or a document.
+    
+    Args:
+        message: User message
+    
+    Returns:
+        dict or None: Extraction in the AI result format, or None if the
+        message needs the AI extractor
+    """
+    match = DATE_ONLY_PATTERN.match(message)
+    if match:
+        return {"important_dates": [match.group(1)]}
+    
+    match = DOCUMENT_ONLY_PATTERN.match(message)
+    if match:
+        return {"documents": [match.group(1)]}
+    
+    return None
+
+
+# Prompt used to extract context from a user message (compiled once)
+EXTRACTION_PROMPT_TEMPLATE = string.Template("""Extract information from this user message and return JSON.
+
+User message: "$user_message"
+
+Extract these categories:
+- user_info: name, location, profession
+- procedures: procedures or services mentioned
+- documents: documents mentioned
+- important_dates: dates mentioned
+
+Return JSON format:
+{
+  "user_info": {"name": "...", "location": "...", "profession": "..."},
+  "procedures": ["..."],
+  "documents": ["..."],
+  "important_dates": ["..."]
+}
+
+Examples:
+"My name is Juan, I live in Buenos Aires. I am an engineer."
+→ {"user_info": {"name": "Juan", "location": "Buenos Aires", "profession": "engineer"}}
+
+"How do I vote in New York?"
+→ {"procedures": ["voting in New York"]}
+
+"I need my ID and passport. Elections are March 15."
+→ {"procedures": ["voting"], "documents": ["ID", "passport"], "important_dates": ["March 15"]}""")
+
+# LRU cache of AI extraction results keyed by message hash (shared across users)
+EXTRACTION_CACHE_MAX_SIZE = 4096
+_extraction_cache: "OrderedDict[str, dict]" = OrderedDict()
+
+
+def _extraction_cache_key(message: str) -> str:
+    """
+    Returns a compact hash key for an extraction request.
+    
+    Only case and whitespace are normalized ("How do I vote?" / "how do  I
+    vote?"); digits and punctuation are kept so "03/15" and "0315" differ.
+    """
+    normalized = " ".join(message.casefold().split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _get_cached_extraction(key: str) -> Optional[dict]:
+    """Returns a cached extraction result and marks it as recently used."""
+    extracted = _extraction_cache.get(key)
+    if extracted is not None:
+        _extraction_cache.move_to_end(key)
+    return extracted
+
+
+def _cache_extraction(key: str, extracted: dict) -> None:
+    """Stores an extraction result, evicting the least recently used entry if full."""
+    _extraction_cache[key] = extracted
+    _extraction_cache.move_to_end(key)
+    if len(_extraction_cache) > EXTRACTION_CACHE_MAX_SIZE:
+        _extraction_cache.popitem(last=False)
+
+
+async def _chat_completion_with_retry(ai_client: AsyncAzureOpenAI, **kwargs):
+    """
+    Calls chat.completions.create with bounded concurrency and exponential backoff.
+    
+    Args:
+        ai_client: Azure OpenAI client
+        **kwargs: Arguments forwarded to chat.completions.create
+    
+    Returns:
+        ChatCompletion: Model response
+    
+    Raises:
+        The last retryable error if all attempts fail.
+    """
+    for attempt in range(1, MAX_EXTRACTION_ATTEMPTS + 1):
+        start = time.perf_counter()
+        try:
+            async with _extraction_semaphore:
+                response = await ai_client.chat.completions.create(**kwargs)
+            if logger.isEnabledFor(logging.DEBUG):
+                usage = getattr(response, "usage", None)
+                logger.debug(
+                    "AI extraction succeeded (attempt=%d, latency=%.3fs, tokens=%s)",
+                    attempt, time.perf_counter() - start,
+                    usage.total_tokens if usage else "n/a"
+                )
+            return response
+        except RETRYABLE_AI_ERRORS as e:
+            if attempt == MAX_EXTRACTION_ATTEMPTS:
+                raise
+            delay = min(30, 2 ** attempt + random.random())
+            logger.warning(
+                "AI extraction failed (attempt=%d, error=%s), retrying in %.1fs",
+                attempt, type(e).__name__, delay
+            )
+            await asyncio.sleep(delay)
+
 
 class UserMemoryProvider(ContextProvider):
     """
@@ -60,23 +444,8 @@ class UserMemoryProvider(ContextProvider):
             use_cosmos: If True, tries to use Cosmos DB; if False, uses local files
         """
         self.user_id = user_id
-        self.profile = {
-            "user_info": {
-                "name": None,
-                "location": None,
-                "profession": None,
-                "last_updated": None
-            },
-            "extracted_data": {
-                "procedures": [],      # Procedimientos/trámites consultados
-                "documents": [],       # Documentos mencionados
-                "important_dates": []  # Fechas importantes
-            }
-        }
-        self.session_data = {
-            "interaction_count": 0,
-            "last_agent": None
-        }
+        self.profile = _empty_profile()
+        self.session_data = _empty_session_data()
         self.ai_client = ai_client
         self.use_cosmos = use_cosmos and COSMOS_AVAILABLE and self._is_cosmos_configured()
         self.cosmos_container = None
@@ -85,15 +454,68 @@ class UserMemoryProvider(ContextProvider):
         if self.use_cosmos:
             try:
                 self.cosmos_container = self._get_cosmos_container()
-            except Exception:
+            except (ValueError, AzureError) as e:
+                logger.warning("Cosmos DB unavailable for user memory, using local files: %s", e)
                 self.use_cosmos = False
         
         # Fallback to local files if Cosmos not available
         if not self.use_cosmos:
-            USER_DATA_DIR.mkdir(exist_ok=True)
+            _ensure_user_data_dir()
         
         # Load existing profile
         self._load_profile()
+        self._rebuild_seen_index()
+        
+        # True when the profile changed since it was last persisted
+        self._dirty = False
+        
+        # Cached invoking() instructions, rebuilt after the profile changes
+        self._context_instructions: Optional[str] = None
+        self._context_cache_valid = False
+        
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_lock = asyncio.Lock()
+        
+        # The router and the specialist share this provider, so both run the
+        # hooks for the same user turn; these make each turn count/extract once
+        self._turn_message: Optional[str] = None
+        self._turn_extracted = False
+    
+    def _rebuild_seen_index(self):
+        """Rebuilds the runtime set index used to de-duplicate extracted items."""
+        extracted = self.profile.get('extracted_data', {})
+        self._seen_items = {
+            category: {_item_key(item) for item in extracted.get(category, [])}
+            for category in EXTRACTED_CATEGORIES
+        }
+    
+    def _mark_changed(self):
+        """Flags the profile as unsaved and invalidates cached context instructions."""
+        self._dirty = True
+        self._context_cache_valid = False
+        _dirty_providers[id(self)] = self
+    
+    def _add_unique_items(self, category: str, items: list):
+        """
+        Appends items to an extracted_data category, skipping duplicates.
+        
+        Args:
+            category: One of EXTRACTED_CATEGORIES
+            items: Items returned by the AI extraction
+        """
+        seen = self._seen_items[category]
+        target = self.profile['extracted_data'].setdefault(category, [])
+        for item in items:
+            if not item or not isinstance(item, str) or item in seen:
+                continue
+            seen.add(item)
+            target.append(item)
+            self._mark_changed()
+            
+            # Ring-buffer behavior: evict the oldest entry once full
+            # (it may be a legacy non-string item, so discard it by its key)
+            if len(target) > MAX_EXTRACTED_ITEMS:
+                seen.discard(_item_key(target.pop(0)))
     
     def _is_cosmos_configured(self) -> bool:
         """Checks if Cosmos DB is configured."""
@@ -105,30 +527,7 @@ class UserMemoryProvider(ContextProvider):
     
     def _get_cosmos_container(self):
         """Gets Cosmos DB container for user memory."""
-        if not COSMOS_AVAILABLE:
-            raise ImportError("azure-cosmos is not installed")
-        
-        # Validate configuration
-        settings.validate_cosmos_db_memory()
-        
-        # Create client
-        if settings.COSMOS_DB.KEY:
-            client = CosmosClient(
-                settings.COSMOS_DB.ENDPOINT,
-                credential=settings.COSMOS_DB.KEY
-            )
-        else:
-            credential = AzureCliCredential()
-            client = CosmosClient(
-                settings.COSMOS_DB.ENDPOINT,
-                credential=credential
-            )
-        
-        # Get container
-        database = client.get_database_client(settings.COSMOS_DB.DATABASE_NAME)
-        container = database.get_container_client(settings.COSMOS_DB.MEMORY_CONTAINER_NAME)
-        
-        return container
+        return _get_memory_container()
     
     def _get_profile_path(self) -> Path:
         """Gets user profile file path (local fallback)."""
@@ -148,86 +547,105 @@ class UserMemoryProvider(ContextProvider):
                 item=self.user_id,
                 partition_key=self.user_id
             )
-            self.profile = item.get('profile', self.profile)
-            self.session_data = item.get('session_data', self.session_data)
+            self.profile = _normalize_profile(item.get('profile'))
+            self.session_data = _normalize_session_data(item.get('session_data'))
         except CosmosResourceNotFoundError:
             # New user, empty profile
             pass
-        except Exception:
+        except AzureError as e:
             # Error loading, use empty profile
-            pass
+            logger.warning("Could not load profile %s from Cosmos DB: %s", self.user_id, e)
     
     def _load_from_file(self):
         """Loads profile from local file (fallback)."""
         profile_path = self._get_profile_path()
         
-        if profile_path.exists():
-            try:
-                with open(profile_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                self.profile = data.get('profile', self.profile)
-                self.session_data = data.get('session_data', self.session_data)
-            except Exception:
-                pass
-                self.profile = {
-                    "user_info": {
-                        "name": None,
-                        "location": None,
-                        "profession": None,
-                        "last_updated": None
-                    },
-                    "extracted_data": {
-                        "procedures": [],
-                        "documents": [],
-                        "important_dates": []
-                    }
-                }
+        if not profile_path.exists():
+            return
+        
+        try:
+            with open(profile_path, 'rb') as f:
+                data = json.loads(f.read())
+        except (OSError, ValueError) as e:
+            # ValueError covers invalid JSON as well as non-UTF-8 content
+            logger.warning("Could not load profile file %s: %s", profile_path, e)
+            return
+        
+        if not isinstance(data, dict):
+            logger.warning("Ignoring profile file %s: not a JSON object", profile_path)
+            return
+        
+        self.profile = _normalize_profile(data.get('profile'))
+        self.session_data = _normalize_session_data(data.get('session_data'))
     
     def _save_profile(self):
         """Saves user profile to Cosmos DB or local file."""
-        if self.use_cosmos and self.cosmos_container:
-            self._save_to_cosmos()
-        else:
-            self._save_to_file()
+        self._write_snapshot(self._snapshot_profile())
     
-    def _save_to_cosmos(self):
-        """Saves profile to Cosmos DB."""
-        try:
-            # Update timestamp
-            self.profile['user_info']['last_updated'] = datetime.now(timezone.utc).isoformat()
+    def _snapshot_profile(self):
+        """
+        Stamps the profile and builds an immutable copy of what will be persisted.
+        
+        Must run on the thread that owns self.profile (the event loop), so the
+        worker thread that writes the snapshot never touches live state.
+        
+        Returns:
+            dict (Cosmos item), bytes (local file) or None if it cannot be serialized
+        """
+        if self.use_cosmos and self.cosmos_container:
+            # Update timestamp (one clock read per save)
+            now = datetime.now(timezone.utc)
+            timestamp = now.isoformat()
+            self.profile['user_info']['last_updated'] = timestamp
             
-            item = {
+            return copy.deepcopy({
                 'id': self.user_id,
                 'user_id': self.user_id,  # Partition key
-                'last_updated': datetime.now(timezone.utc).isoformat(),
+                'last_updated': timestamp,
                 'profile': self.profile,
                 'session_data': self.session_data,
-                '_ts': int(datetime.now(timezone.utc).timestamp())
-            }
-            
-            # Upsert (create or update)
-            self.cosmos_container.upsert_item(body=item)
-        except Exception:
-            pass
+                '_ts': int(now.timestamp())
+            })
+        
+        # Actualizar timestamp
+        timestamp = datetime.now().isoformat()
+        self.profile['user_info']['last_updated'] = timestamp
+        
+        data = {
+            'user_id': self.user_id,
+            'last_updated': timestamp,
+            'profile': self.profile
+        }
+        
+        try:
+            return _dumps_json(data)
+        except (TypeError, ValueError) as e:
+            logger.warning("Could not serialize profile %s: %s", self.user_id, e)
+            return None
     
-    def _save_to_file(self):
-        """Saves profile to local file (fallback)."""
-        profile_path = self._get_profile_path()
+    def _write_snapshot(self, snapshot) -> None:
+        """
+        Writes a snapshot built by _snapshot_profile (safe to run in a worker thread).
         
+        Args:
+            snapshot: Cosmos item (dict), file contents (bytes) or None
+        """
+        if snapshot is None:
+            return
+        
+        if isinstance(snapshot, dict):
+            try:
+                # Upsert (create or update)
+                self.cosmos_container.upsert_item(body=snapshot)
+            except AzureError as e:
+                logger.warning("Could not save profile %s to Cosmos DB: %s", self.user_id, e)
+            return
+        
+        profile_path = self._get_profile_path()
         try:
-            # Actualizar timestamp
-            self.profile['user_info']['last_updated'] = datetime.now().isoformat()
-            
-            data = {
-                'user_id': self.user_id,
-                'last_updated': datetime.now().isoformat(),
-                'profile': self.profile
-            }
-            
-            with open(profile_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception:
-            pass
+            _atomic_write_bytes(profile_path, snapshot)
+        except OSError as e:
+            logger.warning("Could not save profile file %s: %s", profile_path, e)
     
     async def invoking(self, messages, **kwargs) -> Context:
         """
@@ -241,9 +659,30 @@ class UserMemoryProvider(ContextProvider):
         Returns:
             Context: Context with user information
         """
-        # Increment interaction counter
-        self.session_data["interaction_count"] += 1
+        # Increment interaction counter once per user turn, not once per agent
+        user_message = self._extract_last_user_message(messages)
+        if not user_message or user_message != self._turn_message:
+            self._turn_message = user_message
+            self._turn_extracted = False
+            self.session_data["interaction_count"] += 1
+        
+        # Profile-derived instructions only change when the profile does
+        if not self._context_cache_valid:
+            self._context_instructions = self._build_context_instructions()
+            self._context_cache_valid = True
+        
+        if self._context_instructions:
+            return Context(instructions=self._context_instructions)
+        
+        return Context()
+    
+    def _build_context_instructions(self) -> Optional[str]:
+        """
+        Builds the instructions injected by invoking from the current profile.
         
+        Returns:
+            str or None: Instructions text, or None if the profile is empty
+        """
         instructions_parts = []
         
         # Inject user information
@@ -269,11 +708,11 @@ This information persists between conversations. Use it to personalize your resp
         context_items = []
         
         if extracted.get('procedures'):
-            context_items.append(f"Consulted procedures: {', '.join(extracted['procedures'][-5:])}")
+            context_items.append(f"Consulted procedures: {', '.join(map(str, extracted['procedures'][-5:]))}")
         if extracted.get('documents'):
-            context_items.append(f"Mentioned documents: {', '.join(extracted['documents'][-5:])}")
+            context_items.append(f"Mentioned documents: {', '.join(map(str, extracted['documents'][-5:]))}")
         if extracted.get('important_dates'):
-            context_items.append(f"Important dates: {', '.join(extracted['important_dates'][-5:])}")
+            context_items.append(f"Important dates: {', '.join(map(str, extracted['important_dates'][-5:]))}")
         
         if context_items:
             context_text = "\n".join([f"- {item}" for item in context_items])
@@ -283,9 +722,9 @@ This information persists between conversations. Use it to personalize your resp
 Relevant context from prior interactions.""")
         
         if instructions_parts:
-            return Context(instructions="\n\n".join(instructions_parts))
+            return "\n\n".join(instructions_parts)
         
-        return Context()
+        return None
     
     async def invoked(self, request_messages, response_messages, **kwargs) -> None:
         """
@@ -300,12 +739,37 @@ Relevant context from prior interactions.""")
         # Extract last user message
         user_message = self._extract_last_user_message(request_messages)
         
-        # Extract context with AI if available
-        if self.ai_client and user_message:
+        # Extract context with AI if available (skipped if another agent of
+        # this turn already extracted from the same message)
+        already_extracted = self._turn_extracted and user_message == self._turn_message
+        if self.ai_client and user_message and not already_extracted:
+            self._turn_message = user_message
+            self._turn_extracted = True
             await self._extract_context_with_ai(user_message)
         
-        # Save profile after each interaction
-        self._save_profile()
+        # Persist changes with a debounced write-behind instead of once per turn
+        if self._dirty:
+            self._schedule_save()
+    
+    def _schedule_save(self) -> None:
+        """Schedules a debounced save unless one is already pending."""
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._flush_after(SAVE_DEBOUNCE_SECONDS))
+    
+    async def _flush_after(self, delay: float) -> None:
+        """Waits for the debounce window, then flushes pending changes."""
+        await asyncio.sleep(delay)
+        await self.flush()
+    
+    async def flush(self) -> None:
+        """Persists the profile now if it has unsaved changes (I/O runs off the event loop)."""
+        async with self._save_lock:
+            # Re-check after each write: changes made while it ran need another pass
+            while self._dirty:
+                self._dirty = False
+                # Serialize on the loop; only the finished snapshot crosses to the thread
+                await asyncio.to_thread(self._write_snapshot, self._snapshot_profile())
+            _dirty_providers.pop(id(self), None)
     
     def _extract_last_user_message(self, request_messages) -> str:
         """
@@ -317,24 +781,41 @@ Relevant context from prior interactions.""")
         Returns:
             str: Last user message or empty string
         """
-        user_message = ""
+        if isinstance(request_messages, str):
+            return request_messages
         
         if isinstance(request_messages, (list, tuple)):
-            for msg in reversed(list(request_messages)):
-                if hasattr(msg, 'contents') and isinstance(msg.contents, list):
-                    if len(msg.contents) > 0 and hasattr(msg.contents[0], 'text'):
-                        user_message = str(msg.contents[0].text)
-                        break
-                elif hasattr(msg, 'text'):
-                    user_message = str(msg.text)
-                    break
-                elif isinstance(msg, str):
-                    user_message = msg
-                    break
-        elif isinstance(request_messages, str):
-            user_message = request_messages
-        
-        return user_message
+            # Sequences reverse in place; no need to copy them first
+            for msg in reversed(request_messages):
+                text = self._message_text(msg)
+                if text is not None:
+                    return text
+        
+        return ""
+    
+    @staticmethod
+    def _message_text(msg) -> Optional[str]:
+        """
+        Returns the text of a single message, or None if it has no text.
+        
+        Uses one getattr per attribute instead of hasattr + attribute access.
+        
+        Args:
+            msg: ChatMessage-like object or plain string
+        
+        Returns:
+            str or None: Message text
+        """
+        if isinstance(msg, str):
+            return msg
+        
+        contents = getattr(msg, 'contents', None)
+        if isinstance(contents, list):
+            text = getattr(contents[0], 'text', None) if contents else None
+            return str(text) if text is not None else None
+        
+        text = getattr(msg, 'text', None)
+        return str(text) if text is not None else None
     
     async def _extract_context_with_ai(self, user_message: str) -> None:
         """
@@ -348,43 +829,35 @@ Relevant context from prior interactions.""")
         if not user_message or len(user_message.strip()) < 3:
             return
         
+        # Skip the AI call for pure small talk ("hola", "thanks!", "ok, bye")
+        if SMALL_TALK_PATTERN.match(user_message):
+            logger.debug("Skipping AI extraction for small-talk message")
+            return
+        
+        # Bare dates/documents (typical answers to an agent question) need no AI
+        quick = _quick_extract(user_message)
+        if quick is not None:
+            self._apply_extracted_context(quick)
+            return
+        
+        # Identical messages yield the same extraction, reuse it without calling the API
+        cache_key = _extraction_cache_key(user_message)
+        cached = _get_cached_extraction(cache_key)
+        if cached is not None:
+            logger.debug("AI extraction cache hit")
+            self._apply_extracted_context(cached)
+            return
+        
         # Prompt to extract context
-        analysis_prompt = f"""Extract information from this user message and return JSON.
-
-User message: "{user_message}"
-
-Extract these categories:
-- user_info: name, location, profession
-- procedures: procedures or services mentioned
-- documents: documents mentioned
-- important_dates: dates mentioned
-
-Return JSON format:
-{{
-  "user_info": {{"name": "...", "location": "...", "profession": "..."}},
-  "procedures": ["..."],
-  "documents": ["..."],
-  "important_dates": ["..."]
-}}
-
-Examples:
-"My name is Juan, I live in Buenos Aires. I am an engineer."
-→ {{"user_info": {{"name": "Juan", "location": "Buenos Aires", "profession": "engineer"}}}}
-
-"How do I vote in New York?"
-→ {{"procedures": ["voting in New York"]}}
-
-"I need my ID and passport. Elections are March 15."
-→ {{"procedures": ["voting"], "documents": ["ID", "passport"], "important_dates": ["March 15"]}}
-
-Return only JSON, no explanation:"""
+        analysis_prompt = EXTRACTION_PROMPT_TEMPLATE.substitute(user_message=user_message)
         
         try:
             # Use AI to analyze message
-            deployment = os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME", "gpt-4o-deployment")
-            response = await self.ai_client.chat.completions.create(
-                model=deployment,
+            response = await _chat_completion_with_retry(
+                self.ai_client,
+                model=EXTRACTION_DEPLOYMENT,
                 messages=[{"role": "user", "content": analysis_prompt}],
+                response_format={"type": "json_object"},
                 temperature=0.1,
                 max_tokens=300
             )
@@ -398,48 +871,44 @@ Return only JSON, no explanation:"""
             if not ai_response:
                 return
             
-            ai_response = ai_response.strip()
+            # response_format=json_object normally yields a bare JSON object;
+            # fall back to locating it if the deployment wrapped it in prose
+            json_str = _extract_json_span(ai_response)
+            if json_str is None:
+                return
             
-            # Try to extract JSON
-            if "{" in ai_response and "}" in ai_response:
-                start = ai_response.index("{")
-                end = ai_response.rindex("}") + 1
-                json_str = ai_response[start:end]
-                
-                extracted = json.loads(json_str)
-                
-                # Update user_info
-                if 'user_info' in extracted:
-                    user_info = extracted['user_info']
-                    if user_info.get('name'):
-                        self.profile['user_info']['name'] = user_info['name']
-                    if user_info.get('location'):
-                        self.profile['user_info']['location'] = user_info['location']
-                    if user_info.get('profession'):
-                        self.profile['user_info']['profession'] = user_info['profession']
-                
-                # Update procedures (avoid duplicates)
-                if 'procedures' in extracted and extracted['procedures']:
-                    for proc in extracted['procedures']:
-                        if proc and proc not in self.profile['extracted_data']['procedures']:
-                            self.profile['extracted_data']['procedures'].append(proc)
-                
-                # Update documents (avoid duplicates)
-                if 'documents' in extracted and extracted['documents']:
-                    for doc in extracted['documents']:
-                        if doc and doc not in self.profile['extracted_data']['documents']:
-                            self.profile['extracted_data']['documents'].append(doc)
-                
-                # Update important_dates (avoid duplicates)
-                if 'important_dates' in extracted and extracted['important_dates']:
-                    for date in extracted['important_dates']:
-                        if date and date not in self.profile['extracted_data']['important_dates']:
-                            self.profile['extracted_data']['important_dates'].append(date)
-        
-        except json.JSONDecodeError:
-            pass
-        except Exception:
-            pass
+            extracted = json.loads(json_str)
+            
+            if isinstance(extracted, dict):
+                _cache_extraction(cache_key, extracted)
+                self._apply_extracted_context(extracted)
+        
+        except json.JSONDecodeError as e:
+            logger.warning("AI extraction returned invalid JSON: %s", e)
+        except APIError as e:
+            logger.warning("AI extraction failed: %s", e)
+    
+    def _apply_extracted_context(self, extracted: dict) -> None:
+        """
+        Merges AI-extracted context into the user profile.
+        
+        Args:
+            extracted: Parsed extraction result (user_info, procedures, documents, important_dates)
+        """
+        # Update user_info
+        user_info = extracted.get('user_info')
+        if isinstance(user_info, dict):
+            for field in ('name', 'location', 'profession'):
+                value = user_info.get(field)
+                if value and self.profile['user_info'].get(field) != value:
+                    self.profile['user_info'][field] = value
+                    self._mark_changed()
+        
+        # Update procedures, documents and important_dates (avoid duplicates)
+        for category in EXTRACTED_CATEGORIES:
+            items = extracted.get(category)
+            if items and isinstance(items, list):
+                self._add_unique_items(category, items)
     
     def update_profile(self, key: str, value: str):
         """
@@ -450,6 +919,7 @@ Return only JSON, no explanation:"""
             value: Valor del campo
         """
         self.profile[key] = value
+        self._mark_changed()
     
     def get_profile(self) -> dict:
         """
@@ -480,39 +950,16 @@ Return only JSON, no explanation:"""
     
     def clear_profile(self):
         """Limpia el perfil de usuario."""
-        self.profile = {
-            "user_info": {
-                "name": None,
-                "location": None,
-                "profession": None,
-                "last_updated": None
-            },
-            "extracted_data": {
-                "procedures": [],
-                "documents": [],
-                "important_dates": []
-            }
-        }
+        self.profile = _empty_profile()
+        self._rebuild_seen_index()
+        self._mark_changed()
     
     def clear_all(self):
         """Limpia todo: perfil y estadísticas."""
-        self.profile = {
-            "user_info": {
-                "name": None,
-                "location": None,
-                "profession": None,
-                "last_updated": None
-            },
-            "extracted_data": {
-                "procedures": [],
-                "documents": [],
-                "important_dates": []
-            }
-        }
-        self.session_data = {
-            "interaction_count": 0,
-            "last_agent": None
-        }
+        self.profile = _empty_profile()
+        self.session_data = _empty_session_data()
+        self._rebuild_seen_index()
+        self._mark_changed()
     
     def get_session_stats(self) -> dict:
         """
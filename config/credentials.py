@@ -0,0 +1,34 @@
+from functools import lru_cache
+
+from agent_framework.azure import AzureOpenAIChatClient
+from azure.identity import AzureCliCredential
+
+from config.settings import settings
+
+
+@lru_cache(maxsize=1)
+def get_azure_credential() -> AzureCliCredential:
+    """
+    Devuelve la credencial de Azure CLI compartida por todo el proceso.
+
+    Una sola instancia implica un solo caché de tokens: los clientes de Azure
+    OpenAI y Cosmos DB reutilizan el token en lugar de lanzar
+    `az account get-access-token` cada uno por su cuenta.
+    """
+    return AzureCliCredential()
+
+
+@lru_cache(maxsize=1)
+def get_chat_client() -> AzureOpenAIChatClient:
+    """
+    Devuelve el cliente de Azure OpenAI compartido por todos los agentes.
+
+    El orquestador, el agente de reclamos y el agente RAG usan la misma
+    instancia y, por lo tanto, un único pool de conexiones HTTP.
+    """
+    return AzureOpenAIChatClient(
+        credential=get_azure_credential(),
+        endpoint=settings.AZURE_OPENAI.ENDPOINT,
+        deployment_name=settings.AZURE_OPENAI.DEPLOYMENT,
+        api_version=settings.AZURE_OPENAI.API_VERSION
+    )
@@ -11,6 +11,7 @@ class AzureOpenAIConfig:
     ENDPOINT = os.getenv('AZURE_OPENAI_ENDPOINT')
     API_VERSION = os.getenv('AZURE_OPENAI_API_VERSION', '2024-10-21')
     DEPLOYMENT = os.getenv('AZURE_OPENAI_CHAT_DEPLOYMENT_NAME')
+    API_KEY = os.getenv('AZURE_OPENAI_API_KEY')  # Opcional, usado por la extracción de memoria
 
 # Configuración de Azure AI Project (Foundry)
 class AzureAIProjectConfig: